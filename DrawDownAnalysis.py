@@ -1,15 +1,213 @@
 # import dependencies
 import os
+from contextlib import nullcontext
+from math import sqrt
 import numpy as np
 import pandas as pd
-import matplotlib.pylab as plt
-import matplotlib as mpl
 from datetime import datetime
-from itertools import cycle
+
+# numba is optional; without it the kernels step all scenarios at once with numpy
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
 
 # pandas table formatting
 pd.options.display.float_format = "{:,.2f}".format
 
+def _discharge(H_T, A, K_eq, g):
+    """ Chapter 10, Section 10.14, Eq. 8
+    H_T - Total head to overcome losses to produce discharge [ft]
+    A - area of pipe [ft^2]
+    K_eq - equivalent losses
+    g - gravitational constant [ft/s/s]
+    """
+    return A*np.sqrt((2 * g * H_T)/K_eq)
+
+def _read_curve(path, names):
+    """ Read the named columns of a curve csv file into a dataframe
+    path - path to the csv file, with a header row of column names
+    names - columns to read, in the order of the returned dataframe
+    Raises a ValueError if a column is missing from the header
+    """
+    return pd.read_csv(path, usecols=names)[names]
+
+
+def _uniform_buckets(xp, n_cells=4096):
+    """ Index a sorted curve axis on a uniform grid for _interp_uniform
+    xp - increasing curve abscissae
+    n_cells - number of uniform grid cells spanning xp
+    Returns the grid origin, inverse spacing, and the index of the curve
+    segment containing the left edge of each cell.
+    """
+    x0 = xp[0]
+    inv_dx = n_cells / (xp[-1] - xp[0])
+    edges = x0 + np.arange(n_cells) / inv_dx
+    bucket = np.searchsorted(xp, edges, side='right') - 1
+    bucket = np.clip(bucket, 0, len(xp) - 2).astype(np.int64)
+    return x0, inv_dx, bucket
+
+
+@njit(cache=True)
+def _interp_uniform(x, xp, yp, x0, inv_dx, bucket):
+    """ Linear interpolation equivalent to np.interp(x, xp, yp) for increasing xp
+    The bracket is read from the uniform grid built by _uniform_buckets, so it
+    is found in constant time; at most a step or two corrects for segments
+    shorter than a grid cell.
+    """
+    n = xp.shape[0]
+    if x <= xp[0]:
+        return yp[0]
+    if x >= xp[n - 1]:
+        return yp[n - 1]
+    j = bucket[min(int((x - x0) * inv_dx), bucket.shape[0] - 1)]
+    while xp[j] > x:
+        j -= 1
+    while xp[j + 1] <= x:
+        j += 1
+    return (yp[j + 1] - yp[j]) / (xp[j + 1] - xp[j]) * (x - xp[j]) + yp[j]
+
+
+@njit(cache=True, fastmath=True)
+def _step_loop(n, storage_o, H_o, coef, flow_const, cap_stor, cap_head, x0, inv_dx, bucket,
+               head, storage_initial, storage_final, Q):
+    """ Time-stepping kernel of the drawdown analysis
+    Fills head, storage_initial, storage_final and Q in place. The state is
+    carried in double precision whatever the dtype of the result arrays.
+    Q must be zero-initialized: stepping stops once the head is exhausted.
+    storage_o, H_o - initial storage and head [acre-ft, ft]
+    coef, flow_const - discharge [cfs] and change in volume [acre-ft] per sqrt(ft) of head
+    cap_stor, cap_head - capacity curve tabulated as storage vs head [acre-ft, ft]
+    x0, inv_dx, bucket - uniform grid lookup of cap_stor from _uniform_buckets
+    Returns the number of steps computed; the last of them has zero discharge
+    unless the resevoir did not drain within n steps.
+    """
+    storage_initial[0] = storage_o
+    head[0] = H_o
+    sf_prev = storage_o
+    for i in range(n):
+
+        # Skip for first time step
+        if i > 0:
+            # The new storage is the final storage of the last time step;
+            # read the new head from the capacity-head curve
+            head_i = _interp_uniform(sf_prev, cap_stor, cap_head, x0, inv_dx, bucket)
+            storage_initial[i] = sf_prev
+            head[i] = head_i
+        else:
+            head_i = H_o
+
+        # Without head there is no discharge and the state no longer changes;
+        # carry it through the remaining steps
+        if head_i <= 0:
+            storage_final[i] = sf_prev
+            head[i + 1:] = head_i
+            storage_initial[i + 1:] = sf_prev
+            storage_final[i + 1:] = sf_prev
+            return i + 1
+
+        # Discharge (cfs) and final storage (in acre-ft)
+        sqrt_head = sqrt(head_i)
+        sf = sf_prev - flow_const * sqrt_head
+        Q[i] = coef * sqrt_head
+        storage_final[i] = sf
+
+        sf_prev = sf
+    return n
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _sweep_loop(n, storage_o, H_o, coefs, flow_consts, cap_stor, cap_head, x0, inv_dx, bucket,
+                head, storage_initial, storage_final, Q, n_active):
+    """ Time-stepping kernel for several scenarios sharing one capacity curve
+    coefs, flow_consts - discharge and change in volume coefficients of each
+                         scenario; the result arrays hold one row per
+                         scenario, shaped (len(coefs), n)
+    n_active - filled with the number of steps computed for each scenario
+    Scenarios are independent and are distributed across threads.
+    """
+    for k in prange(coefs.shape[0]):
+        n_active[k] = _step_loop(n, storage_o, H_o, coefs[k], flow_consts[k],
+                                 cap_stor, cap_head, x0, inv_dx, bucket,
+                                 head[k], storage_initial[k], storage_final[k], Q[k])
+
+
+def _sweep_numpy(n, storage_o, H_o, coefs, flow_consts, cap_stor, cap_head, x0, inv_dx, bucket,
+                 head, storage_initial, storage_final, Q, n_active):
+    """ Time-stepping kernel for several scenarios, vectorized across scenarios
+    Each python iteration advances every scenario by one step; used in place of
+    _sweep_loop when numba is unavailable. Arguments as for _sweep_loop.
+    """
+    n_k = len(coefs)
+    sf_prev = np.full(n_k, storage_o, dtype=np.float64)
+    head_i = np.full(n_k, H_o, dtype=np.float64)
+    stopped = np.zeros(n_k, dtype=bool)
+    n_active[:] = n
+    for i in range(n):
+
+        # Skip for first time step; scenarios that stopped keep their head
+        if i > 0:
+            head_i = np.where(stopped, head_i, np.interp(sf_prev, cap_stor, cap_head))
+        storage_initial[:, i] = sf_prev
+        head[:, i] = head_i
+
+        # Record the step at which each scenario's head is exhausted
+        newly = (head_i <= 0) & ~stopped
+        if newly.any():
+            n_active[newly] = i + 1
+            stopped |= newly
+
+        # Discharge (cfs) and final storage (in acre-ft); zero once stopped
+        sqrt_head = np.sqrt(np.maximum(head_i, 0))
+        sf_prev = sf_prev - flow_consts * sqrt_head
+        Q[:, i] = coefs * sqrt_head
+        storage_final[:, i] = sf_prev
+
+        # Carry the state through the remaining steps once all have stopped
+        if stopped.all():
+            head[:, i + 1:] = head_i[:, None]
+            storage_initial[:, i + 1:] = sf_prev[:, None]
+            storage_final[:, i + 1:] = sf_prev[:, None]
+            break
+
+
+def _sweep_simd(n, storage_o, H_o, coefs, flow_consts, cap_stor, cap_head, x0, inv_dx, bucket,
+                head, storage_initial, storage_final, Q, n_active):
+    """ Calls the SIMD kernel of sweep_kernel.c through cffi; arguments as for _sweep_loop
+    """
+    def ptr(ctype, a):
+        return _ffi.from_buffer(ctype + "[]", a)
+    _sweep_lib.sweep_loop(n, storage_o, H_o, len(coefs),
+                          ptr("double", coefs), ptr("double", flow_consts),
+                          len(cap_stor), ptr("double", cap_stor), ptr("double", cap_head),
+                          x0, inv_dx, len(bucket), ptr("int64_t", bucket),
+                          ptr("float", head), ptr("float", storage_initial),
+                          ptr("float", storage_final), ptr("float", Q),
+                          ptr("int64_t", n_active))
+
+
+# Prefer the ahead-of-time compiled kernels (see setup.py), which have no JIT
+# start-up cost: the SIMD kernel on CPUs with AVX2, then the Cython kernel
+try:
+    from _sweep_kernel import ffi as _ffi, lib as _sweep_lib
+    SIMD_AVAILABLE = bool(_sweep_lib.sweep_avx2_supported())
+except ImportError:
+    SIMD_AVAILABLE = False
+if SIMD_AVAILABLE:
+    _sweep_kernel = _sweep_simd
+else:
+    try:
+        from _drawdown_kernel import sweep_loop as _sweep_kernel
+    except ImportError:
+        _sweep_kernel = _sweep_loop if NUMBA_AVAILABLE else _sweep_numpy
+
+
 class DrawDownAnalysis:
     """
     Class for performing drawdown analysis of dam outlet works
@@ -33,15 +231,19 @@ class DrawDownAnalysis:
         self.N_mult = None
         self.diam = None
         self.K_eq = None
-        self.area = None
-        self.radius_h = None
         
         # initialize tables
         self.path_area = None
         self.path_cap = None
-        self.df_results = pd.DataFrame()
+        self._results = {}
+        self._df_results = None
+        self._n_active = 0
         self.df_capacity = pd.DataFrame()
         self.df_area = pd.DataFrame()
+        self._cap_elev = None
+        self._cap_stor = None
+        self._stor_lookup = None
+        self._elev_spline = None
 
         print(f"Instantiated drawdown object...: dt: {dt}, n_steps: {n_steps}")
         
@@ -56,12 +258,33 @@ class DrawDownAnalysis:
         self.N_mult = N_mult
         self.diam = diam
         self.K_eq = K_eq
-        self.area = (np.pi/4)*diam**2
-        self.radius_h = self.area/(np.pi*diam) # hydraulic radius = area/perimeter
         print(f"Assigned outlet parameters...: N_mult: {N_mult}, diam: {diam:.2f}, K_eq: {K_eq:.2f}")
         print(f"Derived outlet parameters...: area: {self.area:.2f}, radius_h: {self.radius_h:.2f}")
         return
     
+    @property
+    def area(self):
+        """ Outlet area [ft^2]
+        """
+        if self.diam is None:
+            return None
+        return (np.pi/4)*self.diam**2
+
+    @property
+    def _C_flow(self):
+        """ Discharge (cfs) per sqrt(ft) of head, Q = C_flow*sqrt(H), from the
+        current outlet parameters
+        """
+        return self.N_mult * _discharge(1.0, self.area, self.K_eq, self.GRAVITY)
+
+    @property
+    def radius_h(self):
+        """ Hydraulic radius = area/perimeter [ft]
+        """
+        if self.diam is None:
+            return None
+        return self.area/(np.pi*self.diam)
+    
     def assignResevoirParams(self, elev_o, H_o):
         """ Assign reservoir parameters
         elev_o - initial elevation (max certified pool) [ft]
@@ -81,11 +304,12 @@ class DrawDownAnalysis:
         if (isinstance(cap, str) and isinstance(area, str)): 
             print("Paths passed for area capacity curves...")
             try: 
-                self.df_area = pd.read_csv(area)
-                self.df_capacity = pd.read_csv(cap)
+                # read the curve columns by header name
+                self.df_area = _read_curve(area, ['area-acres', 'elev-ft'])
+                self.df_capacity = _read_curve(cap, ['storage-acre-ft', 'elev-ft'])
                 print("Successful assignment of area capacity curves!")
-            except:
-                print("Unsuccessful assignment of area capacity curves.")
+            except Exception as e:
+                print(f"Unsuccessful assignment of area capacity curves: {e}")
         # Else if data frames are passed into
         elif (isinstance(cap, pd.DataFrame) and isinstance(area, pd.DataFrame)):
             print("Dataframes passed for area capacity curves...")
@@ -101,6 +325,28 @@ class DrawDownAnalysis:
                 print(f"Area column names must follow: {area_names}.")
         else:
             print("Invalid type.")
+        if not self.df_capacity.empty:
+            # Cache the capacity curve as contiguous arrays sorted by storage
+            cap_stor = self.df_capacity['storage-acre-ft'].to_numpy(dtype=np.float64)
+            cap_elev = self.df_capacity['elev-ft'].to_numpy(dtype=np.float64)
+            order = np.argsort(cap_stor, kind='stable')
+            self._cap_stor = np.ascontiguousarray(cap_stor[order])
+            self._cap_elev = np.ascontiguousarray(cap_elev[order])
+            self._stor_lookup = _uniform_buckets(self._cap_stor)
+            self._elev_spline = None
+        return
+    
+    def _injectCurves(self, other):
+        """ Share the area capacity curves of another analysis, skipping the
+        validation and array extraction of assignAreaCapacityCurves
+        other - analysis with area capacity curves already assigned
+        """
+        self.df_area = other.df_area
+        self.df_capacity = other.df_capacity
+        self._cap_elev = other._cap_elev
+        self._cap_stor = other._cap_stor
+        self._stor_lookup = other._stor_lookup
+        self._elev_spline = other._elev_spline
         return
     
     def assignDrawDownTargetElev(self, elev, note=""):
@@ -118,79 +364,186 @@ class DrawDownAnalysis:
         A - area of pipe [ft^2]
         K_eq - equivalent losses
         """
-        Q = A*np.sqrt((2 * self.GRAVITY * H_T)/K_eq)
+        Q = _discharge(H_T, A, K_eq, self.GRAVITY)
         return Q
 
-    def runDrawdownAnalysis(self):
+    def runDrawdownAnalysis(self, method="euler"):
         """ Drawdown analysis routine
+        method - "euler" steps the storage explicitly every dt; "lsoda" integrates it
+                 with scipy's adaptive LSODA solver and samples the solution every dt
         """
-        # initialize arrays
-        time = np.arange(1, self.n_steps + 1) * self.dt
-        elev = np.zeros(self.n_steps)
-        head = np.zeros(self.n_steps)
-        storage_initial = np.zeros(self.n_steps)
-        storage_final = np.zeros(self.n_steps)
-        Q = np.zeros(self.n_steps)
-        V = np.zeros(self.n_steps)
-        dVol = np.zeros(self.n_steps)
-
-        # apply initial conditions
-        elev[0] = self.elev_o
-        head[0] = self.H_o
+        if any(p is None for p in (self.N_mult, self.diam, self.K_eq)):
+            print("Outlet parameters not assigned; use assignOutletParams.")
+            return
+        if method == "euler":
+            results, n_active = self._runScenarios([self._C_flow])
+        elif method == "lsoda":
+            results, n_active = self._solveScenarioODE()
+            if results is None:
+                return
+        else:
+            print(f"Invalid method: {method}. Valid methods are: euler, lsoda")
+            return
+        self._assignResults(results[0], n_active[0])
+        return
+
+    def _assignResults(self, results, n_active):
+        """ Store a dict of result arrays, keyed by column name
+        n_active - number of steps computed before the discharge stopped
+        """
+        self._results = results
+        self._df_results = None
+        self._n_active = int(n_active)
+        return
+
+    @property
+    def df_results(self):
+        """ Results table, built from the result arrays on first access
+        """
+        if self._df_results is None:
+            self._df_results = pd.DataFrame(data=self._results)
+        return self._df_results
+
+    def _runScenarios(self, C_flows):
+        """ Run the drawdown analysis for one or more outlet configurations in a single batch
+        C_flows - discharge (cfs) per sqrt(ft) of head of each scenario
+        Returns a list with a dict of result arrays for each scenario, and the
+        number of steps computed for each scenario
+        """
+        coefs = np.asarray(C_flows, dtype=np.float64)
+        n_k = len(coefs)
+
+        # initialize arrays, one row per scenario; results are stored in
+        # single precision (the kernel steps in double precision)
+        time = np.arange(1, self.n_steps + 1, dtype=np.float32) * self.dt
+        head = np.zeros((n_k, self.n_steps), dtype=np.float32)
+        storage_initial = np.zeros((n_k, self.n_steps), dtype=np.float32)
+        storage_final = np.zeros((n_k, self.n_steps), dtype=np.float32)
+        Q = np.zeros((n_k, self.n_steps), dtype=np.float32)
+        n_active = np.zeros(n_k, dtype=np.int64)
+
         # Get initial storage from capacity-curve based on initial elev
-        self.df_capacity['elev-ft']
-        storage_initial[0] = np.interp(self.elev_o,                           
-                                       self.df_capacity['elev-ft'], 
-                                       self.df_capacity['storage-acre-ft'])
+        storage_o = np.interp(self.elev_o, self._cap_elev, self._cap_stor)
 
-        # Perform the n steps of discharge calculations
-        for i in range(self.n_steps):
+        # Change in volume (acre-ft) over one dt (hrs) per sqrt(ft) of head
+        vol_coef = self.CFS_TO_ACREFT_PERHOUR * self.dt
+        flow_consts = coefs * vol_coef
 
-            # Skip for first time step
-            if i > 0:
-                # The new storage is the final storage of the last time step
-                storage_initial[i] = storage_final[i-1]
+        # Tabulate the capacity curve as storage vs head, so each step takes a
+        # single lookup (the sqrt is kept exact: tabulating the discharge
+        # itself would make the pool drain asymptotically near empty)
+        elev_offset = self.elev_o - self.H_o
+        cap_head = self._cap_elev - elev_offset
 
-                # Read the new elevation from the capacity-elev. curve
-                elev[i] = np.interp(storage_final[i-1], 
-                                    self.df_capacity['storage-acre-ft'], 
-                                    self.df_capacity['elev-ft'])
+        # Perform the n steps of discharge calculations for every scenario
+        _sweep_kernel(self.n_steps, storage_o, self.H_o, coefs, flow_consts,
+                      self._cap_stor, cap_head, *self._stor_lookup,
+                      head, storage_initial, storage_final, Q, n_active)
 
-                # Update the head based on the change in elevation
-                head[i] = head[i-1] + (elev[i] - elev[i-1])  
+        # Change in volume (in acre-ft)
+        dVol = Q * vol_coef
+        return self._collectResults(time, head, storage_initial, storage_final, Q, dVol), n_active
 
-            # Discharge (cfs)
-            if head[i] > 0: # discharge is positive so long as head is positive
-                Q[i] = self.N_mult * self.discharge(head[i], self.area, self.K_eq)
-                Q[i] = max(0, Q[i]) # flow must be non-negative
+    def _elevSpline(self):
+        """ Monotone cubic (PCHIP) interpolant of elevation vs storage (requires scipy)
+        Built once per capacity curve, and shared with sensitivity analyses; of
+        repeated storage values only the last node is kept, and the spline is
+        not extrapolated beyond the curve
+        """
+        if self._elev_spline is None:
+            from scipy.interpolate import PchipInterpolator
+            keep = np.append(np.diff(self._cap_stor) > 0, True)
+            self._elev_spline = PchipInterpolator(self._cap_stor[keep], self._cap_elev[keep],
+                                                  extrapolate=False)
+        return self._elev_spline
 
-            # Velocity (ft/s)
-            V[i] = Q[i]/self.area
+    def _solveScenarioODE(self, rtol=1e-6):
+        """ Integrate the drawdown as the ODE dS/dt = -Q(S) with LSODA (requires scipy)
+        rtol - relative tolerance of the solver
+        The capacity curve is interpolated with a monotone cubic, so the solver
+        does not have to resolve a kink at every curve node.
+        Returns the results as _runScenarios does for a single scenario; each row
+        spans one dt, from the solution sampled at its start and end. Returns
+        None, None if the solver fails before the end of the analysis
+        """
+        from scipy.integrate import solve_ivp
 
-            # Change in volume (in acre-ft)
-            dVol[i] = (Q[i] * self.CFS_TO_ACREFT_PERHOUR)/self.dt
+        # Head vs storage, initial storage, and the storage rate (acre-ft/hr)
+        # per sqrt(ft) of head
+        elev_offset = self.elev_o - self.H_o
+        elev_spline = self._elevSpline()
+        stor_lo, stor_hi = self._cap_stor[0], self._cap_stor[-1]
+        def head_of(S):
+            # hold the end values of the curve outside of it, as np.interp does
+            return elev_spline(np.clip(S, stor_lo, stor_hi)) - elev_offset
+        storage_o = np.interp(self.elev_o, self._cap_elev, self._cap_stor)
+        flow_const = self._C_flow * self.CFS_TO_ACREFT_PERHOUR
 
-            # Compute the final storage (in acre-ft)
-            storage_final[i] = storage_initial[i] - dVol[i]
-    
-        # Create a dataframe for output
-        df = pd.DataFrame(data={'time(days)':time/24,
-                                'elev(ft)':elev, 
-                                'head(ft)':head,
-                                'storage_initial(acre-ft)':storage_initial,
-                                'Q(cfs)':Q, 
-                                'V(ft/s)':V,
-                                'dVol(acre-ft)':dVol,
-                                'storage_final(acre-ft)':storage_final
-                               })
-        self.df_results = df
-        return
+        def rhs(t, S):
+            return -flow_const * np.sqrt(np.maximum(head_of(S), 0))
+
+        def drained(t, S):
+            return head_of(S[0])
+        drained.terminal = True
+        drained.direction = -1
+
+        t_end = self.n_steps * self.dt
+        sol = solve_ivp(rhs, (0, t_end), [storage_o], method='LSODA',
+                        events=drained, dense_output=True, rtol=rtol)
+        if not sol.success:
+            print(f"LSODA solver failed: {sol.message}")
+            return None, None
+
+        # Sample the storage at the step boundaries; it holds once the head is exhausted
+        t = np.arange(self.n_steps + 1) * self.dt
+        t_drained = sol.t_events[0][0] if sol.t_events[0].size else np.inf
+        flowing = t < t_drained
+        storage = np.full(t.shape, sol.y[0, -1])
+        storage[flowing] = sol.sol(t[flowing])[0]
+
+        # Head and discharge at the start of each step
+        head = head_of(storage[:-1])
+        Q = np.where(flowing[:-1] & (head > 0), self._C_flow * np.sqrt(np.maximum(head, 0)), 0.0)
+        stopped = Q == 0
+        n_active = int(np.argmax(stopped)) + 1 if stopped.any() else self.n_steps
+
+        def row(a):
+            return a[None, :].astype(np.float32)
+        time = np.arange(1, self.n_steps + 1, dtype=np.float32) * self.dt
+        results = self._collectResults(time, row(head), row(storage[:-1]), row(storage[1:]),
+                                       row(Q), row(storage[:-1] - storage[1:]))
+        return results, np.array([n_active])
+
+    def _collectResults(self, time, head, storage_initial, storage_final, Q, dVol):
+        """ Collect the output columns of each scenario into a dict of result arrays
+        time - end time of each step [hrs]
+        head, storage_initial, storage_final, Q, dVol - result arrays with one row per scenario
+        """
+        # Elevation follows from the head
+        elev = head + (self.elev_o - self.H_o)
+
+        # Velocity (ft/s)
+        V = Q / self.area
+
+        results = [{'time(days)':time/24,
+                    'elev(ft)':elev[k],
+                    'head(ft)':head[k],
+                    'storage_initial(acre-ft)':storage_initial[k],
+                    'Q(cfs)':Q[k],
+                    'V(ft/s)':V[k],
+                    'dVol(acre-ft)':dVol[k],
+                    'storage_final(acre-ft)':storage_final[k]
+                   }
+                   for k in range(len(head))]
+        return results
     
     def plotDrawdown(self, key_x=None, key_y=None):
         """ Plot drawdown analysis
         key_x = optional key for independent variable
         key_y = optional key for dependent variable
         """
+        # matplotlib is imported on first use, it is the slowest import by far
+        import matplotlib.pylab as plt
         if not self.df_results.empty:
             if not key_x and not key_y:  
                 key_x = self.df_results.columns[0]
@@ -211,6 +564,7 @@ class DrawDownAnalysis:
     def plotAreaCapacity(self):
         """ Plot the capacity-area vs elevation curves
         """
+        import matplotlib.pylab as plt
         if not self.df_capacity.empty and not self.df_area.empty:
             fig, ax = plt.subplots(1, 2, figsize=(12, 4))
             ax[0].plot(self.df_area['area-acres'], self.df_area['elev-ft'])
@@ -233,21 +587,25 @@ class DrawDownAnalysis:
     def saveResultsToCSV(self, tag="drawdown-analysis"):
         """ Save the results to a .csv file
         """
-        if not self.df_results.empty:
+        if self._results:
             fname = f"{str(datetime.now().date())}" + f"-{tag}.csv"
-            self.df_results.to_csv(fname)
+            np.savetxt(fname, np.column_stack(list(self._results.values())),
+                       fmt='%.6g', delimiter=',', header=','.join(self._results), comments='')
             print(f"Results saved to {fname}")
         return
     
     def summarize(self, verbose=True):
         """ Report time to 10% reduction in max certified to heel of dam, and time to drained resevoir
         verbose - if true, prints statements
+        Times are nan if not reached within the analysis steps
         """
-        if not self.df_results.empty:
-            mask_10percH = self.df_results['elev(ft)'] < self.elev_drawdown
-            drained_index = self.df_results['dVol(acre-ft)'][self.df_results['dVol(acre-ft)'] == 0].index[0]
-            t_10percH = self.df_results[mask_10percH]['time(days)'].iloc[0]
-            t_drained = self.df_results['time(days)'].loc[drained_index]
+        if self._results:
+            time = self._results['time(days)']
+            below = self._results['elev(ft)'] < self.elev_drawdown
+            i_10percH = int(np.argmax(below))
+            drained_index = self._n_active - 1
+            t_10percH = time[i_10percH] if below[i_10percH] else np.nan
+            t_drained = time[drained_index] if self._results['dVol(acre-ft)'][drained_index] == 0 else np.nan
             if verbose:
                 print(f"Time at which 10% head is reduced: {t_10percH:.2f} days" )
                 print(f"Time at which resevoir is drained: {t_drained:.2f} days" )
@@ -257,63 +615,95 @@ class DrawDownAnalysis:
         """ Display table results
         elev - target elevation to center table [ft]; if None, returns table to drawdown
         """
-        if elev:
-            mask = Analysis.df_results['elev(ft)'] < elev
-            print(f"Elevation reached at index: {Analysis.df_results[mask].index[0]}")
-            return Analysis.df_results[Analysis.df_results[mask].index[0]-5:].head(10)
+        if elev is not None:
+            below = self._results['elev(ft)'] < elev
+            index = int(np.argmax(below))
+            if not below[index]:
+                print(f"Elevation {elev} not reached within the analysis steps.")
+                return
+            print(f"Elevation reached at index: {index}")
+            return self.df_results.iloc[max(0, index - 5):].head(10)
         else:
-            drained_index = Analysis.df_results['dVol(acre-ft)'][Analysis.df_results['dVol(acre-ft)'] == 0].index[0]
+            drained_index = self._n_active - 1
+            if self._results['dVol(acre-ft)'][drained_index] != 0:
+                print("Zero discharge not reached within the analysis steps.")
+                return
             print(f"Zero discharge reached at index: {drained_index}")
-            return Analysis.df_results.head(drained_index + 1)
+            return self.df_results.head(drained_index + 1)
     
-    def sensitivityAnalysis(self, ratios = [1.0, 1.25, 1.5, 2.0, 5.0, 10.0], display=True):
+    def sensitivityAnalysis(self, ratios = [1.0, 1.25, 1.5, 2.0, 5.0, 10.0], display=True, path=None):
         """
         Performs sensitivity analysis for different loss ratios
         ratios - loss ratio sensitivity value = K(sensitivity analysis)/K_eq(base analysis)
                  defaults to ratios of [1.0, 1.25, 1.5, 2.0, 5.0, 10.0]
         display - boolean flag for displaying summary results
+        path - optional Arrow IPC file to write the results of every scenario to,
+               one record batch per scenario (requires pyarrow)
         """
         analyses = [] 
         time_drawdowns = [] 
         time_drained = []
         K_values = np.array(ratios) * self.K_eq
-        for i, k in enumerate(K_values):
+        for k in K_values:
             # instantiate a new object using exisitng params but for different k values
             a = DrawDownAnalysis(dt=self.dt, n_steps=self.n_steps)
             a.assignOutletParams(self.N_mult, self.diam, k)
             a.assignResevoirParams(self.elev_o, self.H_o)
-            a.assignAreaCapacityCurves(self.df_area, self.df_capacity)
+            a._injectCurves(self)
             a.assignDrawDownTargetElev(self.elev_drawdown, note="")
-
-            # run the analysis and save results for plotting
-            a.runDrawdownAnalysis()
-            t10, tdrain = a.summarize(verbose=False)
-            time_drawdowns.append(t10)
-            time_drained.append(tdrain)
             analyses.append(a)
+
+        # run every scenario in one batch through the kernel
+        results, n_active = self._runScenarios([a._C_flow for a in analyses])
+        writer = nullcontext()
+        if path is not None:
+            import pyarrow as pa
+            schema = pa.schema([('K', pa.float64())] +
+                               [(c, pa.from_numpy_dtype(v.dtype)) for c, v in results[0].items()])
+            writer = pa.ipc.new_file(path, schema)
+        # the writer is closed (and the file completed) even if a scenario fails
+        with writer:
+            for a, result, n in zip(analyses, results, n_active):
+                # save results for plotting
+                a._assignResults(result, n)
+                t10, tdrain = a.summarize(verbose=False)
+                time_drawdowns.append(t10)
+                time_drained.append(tdrain)
+
+                # write the scenario's results as they are summarized
+                if path is not None:
+                    K = np.full(self.n_steps, a.K_eq)
+                    writer.write_batch(pa.record_batch([K] + list(result.values()), schema=schema))
+        if path is not None:
+            print(f"Sensitivity results saved to {path}")
             
-        # Plot the results
-        symbols = cycle(['o','s','^'])
+        # Plot the results as a single collection of subsampled lines
+        import matplotlib.pylab as plt
+        from matplotlib.collections import LineCollection
+        from matplotlib.lines import Line2D
         x, y = 'time(days)', 'storage_initial(acre-ft)'
-        t_max = analyses[0].df_results['time(days)'].max()
+        t_max = analyses[0]._results['time(days)'].max()
+        stride = max(1, self.n_steps // 500)
+        colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        colors = [colors[i % len(colors)] for i in range(len(analyses))]
+        lines = [np.column_stack((ai._results[x][::stride], ai._results[y][::stride]))
+                 for ai in analyses]
 
         fig = plt.figure(figsize=(8,6))
-        for ai in analyses:
-            plt.plot(ai.df_results[x], 
-                    ai.df_results[y],
-                    marker=next(symbols),
-                    markevery=100, 
-                    markeredgecolor='teal',
-                    label=f'K_eq={ai.K_eq:.2f}')
-        plt.plot([0, t_max],
-                np.ones(2)*ai.getStorageAtElev(self.elev_drawdown),
-                'k--', lw=1.0,
-                label='10% Drawdown')
+        ax = plt.gca()
+        ax.add_collection(LineCollection(lines, colors=colors))
+        ax.autoscale_view()
+        handles = [Line2D([], [], color=c, label=f'K_eq={ai.K_eq:.2f}')
+                   for c, ai in zip(colors, analyses)]
+        handles += plt.plot([0, t_max],
+                            np.ones(2)*self.getStorageAtElev(self.elev_drawdown),
+                            'k--', lw=1.0,
+                            label='10% Drawdown')
 
         plt.grid(which='both',alpha=0.2)
         plt.xlabel(x), plt.ylabel(y)
         plt.xlim(left=0, right=t_max), plt.ylim(bottom=0)
-        plt.legend(loc='upper right')
+        plt.legend(handles=handles, loc='upper right')
         plt.show()
 
         # print results
@@ -336,8 +726,9 @@ if __name__ == '__main__':
     n2 = 0.061                # Manning's roughness coefficient for ductile iron (typ)
 
     radius_h = diam/4                              # Hydraulic radius = area/(wetted perimeter)
-    K_f1 = 29.1*(n1**2)*(L1/(radius_h**(4/3)))     # Loss due to pipe friction in steel
-    K_f2 = 29.1*(n2**2)*(L2/(radius_h**(4/3)))     # Loss due to pipe friction in ductile iron
+    c_f = 29.1/(radius_h**(4/3))                   # Friction loss factor common to both materials
+    K_f1 = c_f*(n1*n1)*L1                          # Loss due to pipe friction in steel
+    K_f2 = c_f*(n2*n2)*L2                          # Loss due to pipe friction in ductile iron
     K_f = K_f1 + K_f2                              # Total loss
 
     area_ratio = 0.62                              # Ratio of net through area to new trashrack area
@@ -0,0 +1,91 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+""" Ahead-of-time compiled drawdown kernel
+Mirrors _interp_uniform, _step_loop and _sweep_loop in DrawDownAnalysis.py, which
+imports sweep_loop from here when the extension is built:
+    python setup.py build_ext --inplace
+"""
+from libc.math cimport sqrt
+from libc.stdint cimport int64_t
+
+
+cdef inline double interp_uniform(double x, const double[::1] xp, const double[::1] yp,
+                                  double x0, double inv_dx,
+                                  const int64_t[::1] bucket) noexcept nogil:
+    """ Linear interpolation equivalent to np.interp(x, xp, yp) for increasing xp
+    """
+    cdef Py_ssize_t n = xp.shape[0]
+    cdef Py_ssize_t cell, j
+    if x <= xp[0]:
+        return yp[0]
+    if x >= xp[n - 1]:
+        return yp[n - 1]
+    cell = <Py_ssize_t>((x - x0) * inv_dx)
+    if cell > bucket.shape[0] - 1:
+        cell = bucket.shape[0] - 1
+    j = bucket[cell]
+    while xp[j] > x:
+        j -= 1
+    while xp[j + 1] <= x:
+        j += 1
+    return (yp[j + 1] - yp[j]) / (xp[j + 1] - xp[j]) * (x - xp[j]) + yp[j]
+
+
+cdef int64_t step_loop(Py_ssize_t k, Py_ssize_t n, double storage_o, double H_o,
+                       double coef, double flow_const,
+                       const double[::1] cap_stor, const double[::1] cap_head,
+                       double x0, double inv_dx, const int64_t[::1] bucket,
+                       float[:, ::1] head, float[:, ::1] storage_initial,
+                       float[:, ::1] storage_final, float[:, ::1] Q) noexcept nogil:
+    """ Time-stepping kernel of scenario k, see _step_loop
+    """
+    cdef Py_ssize_t i, j
+    cdef double sf_prev = storage_o
+    cdef double head_i, sqrt_head, sf
+    storage_initial[k, 0] = storage_o
+    head[k, 0] = H_o
+    for i in range(n):
+
+        # Skip for first time step
+        if i > 0:
+            # The new storage is the final storage of the last time step;
+            # read the new head from the capacity-head curve
+            head_i = interp_uniform(sf_prev, cap_stor, cap_head, x0, inv_dx, bucket)
+            storage_initial[k, i] = sf_prev
+            head[k, i] = head_i
+        else:
+            head_i = H_o
+
+        # Without head there is no discharge and the state no longer changes;
+        # carry it through the remaining steps
+        if head_i <= 0:
+            storage_final[k, i] = sf_prev
+            for j in range(i + 1, n):
+                head[k, j] = head_i
+                storage_initial[k, j] = sf_prev
+                storage_final[k, j] = sf_prev
+            return i + 1
+
+        # Discharge (cfs) and final storage (in acre-ft)
+        sqrt_head = sqrt(head_i)
+        sf = sf_prev - flow_const * sqrt_head
+        Q[k, i] = coef * sqrt_head
+        storage_final[k, i] = sf
+
+        sf_prev = sf
+    return n
+
+
+def sweep_loop(Py_ssize_t n, double storage_o, double H_o,
+               const double[::1] coefs, const double[::1] flow_consts,
+               const double[::1] cap_stor, const double[::1] cap_head,
+               double x0, double inv_dx, const int64_t[::1] bucket,
+               float[:, ::1] head, float[:, ::1] storage_initial,
+               float[:, ::1] storage_final, float[:, ::1] Q, int64_t[::1] n_active):
+    """ Time-stepping kernel for several scenarios sharing one capacity curve, see _sweep_loop
+    """
+    cdef Py_ssize_t k
+    with nogil:
+        for k in range(coefs.shape[0]):
+            n_active[k] = step_loop(k, n, storage_o, H_o, coefs[k], flow_consts[k],
+                                    cap_stor, cap_head, x0, inv_dx, bucket,
+                                    head, storage_initial, storage_final, Q)
@@ -0,0 +1,20 @@
+""" Builds the optional compiled drawdown kernels (requires Cython and cffi):
+    python setup.py build_ext --inplace
+_drawdown_kernel is the Cython kernel; _sweep_kernel is the AVX2/FMA kernel for
+batches of scenarios. DrawDownAnalysis.py falls back to its numba/python kernel
+when neither extension is present.
+"""
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+extensions = [
+    Extension("_drawdown_kernel", ["_drawdown_kernel.pyx"],
+              extra_compile_args=["-O3", "-march=native", "-ffast-math"]),
+]
+
+setup(
+    name="drawdown-analysis",
+    py_modules=["DrawDownAnalysis"],
+    ext_modules=cythonize(extensions),
+    cffi_modules=["sweep_kernel_build.py:ffibuilder"],
+)
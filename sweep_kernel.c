@@ -0,0 +1,224 @@
+/* SIMD drawdown kernel for batches of scenarios sharing one capacity curve
+ * Mirrors sweep_loop in _drawdown_kernel.pyx and _sweep_loop in DrawDownAnalysis.py.
+ * On x86-64 CPUs with AVX2 and FMA four scenarios are stepped per register;
+ * leftover scenarios, other CPUs and other platforms use the scalar loop. The
+ * AVX2 code is compiled through target attributes and chosen at run time, so
+ * the rest of the module needs no -mavx2. Built through sweep_kernel_build.py.
+ */
+#include <math.h>
+#include <stdint.h>
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#define SWEEP_AVX2 1
+#define AVX2_TARGET __attribute__((target("avx2,fma")))
+#include <immintrin.h>
+#endif
+
+/* Index j of the curve segment with xp[j] <= x < xp[j+1], read from the uniform
+ * grid built by _uniform_buckets; x must lie strictly inside the curve */
+static inline int64_t bracket(double x, const double *xp, double x0, double inv_dx,
+                              int64_t n_bucket, const int64_t *bucket)
+{
+    int64_t cell = (int64_t)((x - x0) * inv_dx);
+    int64_t j;
+    if (cell > n_bucket - 1)
+        cell = n_bucket - 1;
+    j = bucket[cell];
+    while (xp[j] > x)
+        j--;
+    while (xp[j + 1] <= x)
+        j++;
+    return j;
+}
+
+/* Linear interpolation equivalent to np.interp(x, xp, yp) for increasing xp */
+static inline double interp(double x, int64_t n_curve, const double *xp, const double *yp,
+                            double x0, double inv_dx, int64_t n_bucket, const int64_t *bucket)
+{
+    int64_t j;
+    if (x <= xp[0])
+        return yp[0];
+    if (x >= xp[n_curve - 1])
+        return yp[n_curve - 1];
+    j = bracket(x, xp, x0, inv_dx, n_bucket, bucket);
+    return (yp[j + 1] - yp[j]) / (xp[j + 1] - xp[j]) * (x - xp[j]) + yp[j];
+}
+
+/* Carry the stopped state of scenario k through steps i+1 .. n-1 */
+static void fill_tail(int64_t k, int64_t i, int64_t n, double head_i, double sf,
+                      float *head, float *storage_initial, float *storage_final)
+{
+    int64_t j;
+    for (j = i + 1; j < n; j++) {
+        head[k * n + j] = (float)head_i;
+        storage_initial[k * n + j] = (float)sf;
+        storage_final[k * n + j] = (float)sf;
+    }
+}
+
+/* Time-stepping loop of scenario k, see _step_loop */
+static int64_t step_scalar(int64_t k, int64_t n, double storage_o, double H_o,
+                           double coef, double flow_const,
+                           int64_t n_curve, const double *cap_stor, const double *cap_head,
+                           double x0, double inv_dx, int64_t n_bucket, const int64_t *bucket,
+                           float *head, float *storage_initial, float *storage_final, float *Q)
+{
+    double sf_prev = storage_o;
+    double head_i, sqrt_head, sf;
+    int64_t i;
+    storage_initial[k * n] = (float)storage_o;
+    head[k * n] = (float)H_o;
+    for (i = 0; i < n; i++) {
+        if (i > 0) {
+            head_i = interp(sf_prev, n_curve, cap_stor, cap_head, x0, inv_dx, n_bucket, bucket);
+            storage_initial[k * n + i] = (float)sf_prev;
+            head[k * n + i] = (float)head_i;
+        } else {
+            head_i = H_o;
+        }
+        if (head_i <= 0) {
+            storage_final[k * n + i] = (float)sf_prev;
+            fill_tail(k, i, n, head_i, sf_prev, head, storage_initial, storage_final);
+            return i + 1;
+        }
+        sqrt_head = sqrt(head_i);
+        sf = sf_prev - flow_const * sqrt_head;
+        Q[k * n + i] = (float)(coef * sqrt_head);
+        storage_final[k * n + i] = (float)sf;
+        sf_prev = sf;
+    }
+    return n;
+}
+
+#ifdef SWEEP_AVX2
+/* Store the four lanes of v at step i of scenarios k0 .. k0+3 */
+static inline AVX2_TARGET void store_lanes(__m256d v, float *out, int64_t k0, int64_t i, int64_t n)
+{
+    float f[4];
+    int l;
+    _mm_storeu_ps(f, _mm256_cvtpd_ps(v));
+    for (l = 0; l < 4; l++)
+        out[(k0 + l) * n + i] = f[l];
+}
+
+/* Time-stepping loop of scenarios k0 .. k0+3, one scenario per lane. Once a
+ * lane's head is exhausted its discharge is zero, so its storage no longer
+ * changes; the lane keeps stepping until every lane has stopped. */
+static AVX2_TARGET void step_avx2(int64_t k0, int64_t n, double storage_o, double H_o,
+                      const double *coefs, const double *flow_consts,
+                      int64_t n_curve, const double *cap_stor, const double *cap_head,
+                      double x0, double inv_dx, int64_t n_bucket, const int64_t *bucket,
+                      float *head, float *storage_initial, float *storage_final, float *Q,
+                      int64_t *n_active)
+{
+    const __m256d zero = _mm256_setzero_pd();
+    const __m256d x_lo = _mm256_set1_pd(cap_stor[0]);
+    const __m256d x_hi = _mm256_set1_pd(cap_stor[n_curve - 1]);
+    const __m256d y_lo = _mm256_set1_pd(cap_head[0]);
+    const __m256d y_hi = _mm256_set1_pd(cap_head[n_curve - 1]);
+    const __m256i one = _mm256_set1_epi64x(1);
+    const __m256d coef = _mm256_loadu_pd(coefs + k0);
+    const __m256d flow_const = _mm256_loadu_pd(flow_consts + k0);
+    __m256d sf = _mm256_set1_pd(storage_o);
+    __m256d head_i = _mm256_set1_pd(H_o);
+    __m256d stopped_lanes = zero;
+    int stopped = 0;
+    int64_t i, l;
+
+    for (i = 0; i < n; i++) {
+        if (i > 0) {
+            /* Bracket each lane, then interpolate all lanes at once */
+            double s[4];
+            int64_t j[4];
+            __m256i vj, vj1;
+            __m256d xa, xb, ya, yb, h;
+            _mm256_storeu_pd(s, sf);
+            for (l = 0; l < 4; l++)
+                j[l] = (s[l] <= cap_stor[0]) ? 0
+                     : (s[l] >= cap_stor[n_curve - 1]) ? n_curve - 2
+                     : bracket(s[l], cap_stor, x0, inv_dx, n_bucket, bucket);
+            vj = _mm256_loadu_si256((const __m256i *)j);
+            vj1 = _mm256_add_epi64(vj, one);
+            xa = _mm256_i64gather_pd(cap_stor, vj, 8);
+            xb = _mm256_i64gather_pd(cap_stor, vj1, 8);
+            ya = _mm256_i64gather_pd(cap_head, vj, 8);
+            yb = _mm256_i64gather_pd(cap_head, vj1, 8);
+            h = _mm256_fmadd_pd(_mm256_div_pd(_mm256_sub_pd(yb, ya), _mm256_sub_pd(xb, xa)),
+                                _mm256_sub_pd(sf, xa), ya);
+            h = _mm256_blendv_pd(h, y_lo, _mm256_cmp_pd(sf, x_lo, _CMP_LE_OQ));
+            h = _mm256_blendv_pd(h, y_hi, _mm256_cmp_pd(sf, x_hi, _CMP_GE_OQ));
+            /* Stopped lanes keep the head they stopped at */
+            head_i = _mm256_blendv_pd(h, head_i, stopped_lanes);
+        }
+        store_lanes(sf, storage_initial, k0, i, n);
+        store_lanes(head_i, head, k0, i, n);
+
+        /* Record the step at which each lane's head is exhausted */
+        {
+            int newly = ~_mm256_movemask_pd(_mm256_cmp_pd(head_i, zero, _CMP_GT_OQ)) & 0xF & ~stopped;
+            if (newly) {
+                for (l = 0; l < 4; l++)
+                    if (newly & (1 << l))
+                        n_active[k0 + l] = i + 1;
+                stopped |= newly;
+                stopped_lanes = _mm256_castsi256_pd(_mm256_set_epi64x(
+                    -(int64_t)((stopped >> 3) & 1), -(int64_t)((stopped >> 2) & 1),
+                    -(int64_t)((stopped >> 1) & 1), -(int64_t)(stopped & 1)));
+            }
+        }
+
+        /* Discharge (cfs) and final storage (in acre-ft); zero for stopped lanes */
+        {
+            __m256d sqrt_head = _mm256_sqrt_pd(_mm256_max_pd(head_i, zero));
+            sf = _mm256_fnmadd_pd(flow_const, sqrt_head, sf);
+            store_lanes(_mm256_mul_pd(coef, sqrt_head), Q, k0, i, n);
+            store_lanes(sf, storage_final, k0, i, n);
+        }
+
+        if (stopped == 0xF) {
+            double h[4], s[4];
+            _mm256_storeu_pd(h, head_i);
+            _mm256_storeu_pd(s, sf);
+            for (l = 0; l < 4; l++)
+                fill_tail(k0 + l, i, n, h[l], s[l], head, storage_initial, storage_final);
+            return;
+        }
+    }
+    for (l = 0; l < 4; l++)
+        if (!(stopped & (1 << l)))
+            n_active[k0 + l] = n;
+}
+#endif
+
+/* Whether this CPU runs the AVX2 loop of sweep_loop */
+int sweep_avx2_supported(void)
+{
+#ifdef SWEEP_AVX2
+    __builtin_cpu_init();
+    return __builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma");
+#else
+    return 0;
+#endif
+}
+
+/* Time-stepping kernel for several scenarios sharing one capacity curve; the
+ * result arrays are row-major, shaped (n_k, n) */
+void sweep_loop(int64_t n, double storage_o, double H_o, int64_t n_k,
+                const double *coefs, const double *flow_consts,
+                int64_t n_curve, const double *cap_stor, const double *cap_head,
+                double x0, double inv_dx, int64_t n_bucket, const int64_t *bucket,
+                float *head, float *storage_initial, float *storage_final, float *Q,
+                int64_t *n_active)
+{
+    int64_t k = 0;
+#ifdef SWEEP_AVX2
+    if (sweep_avx2_supported())
+        for (; k + 4 <= n_k; k += 4)
+            step_avx2(k, n, storage_o, H_o, coefs, flow_consts, n_curve, cap_stor, cap_head,
+                      x0, inv_dx, n_bucket, bucket, head, storage_initial, storage_final, Q,
+                      n_active);
+#endif
+    for (; k < n_k; k++)
+        n_active[k] = step_scalar(k, n, storage_o, H_o, coefs[k], flow_consts[k],
+                                  n_curve, cap_stor, cap_head, x0, inv_dx, n_bucket, bucket,
+                                  head, storage_initial, storage_final, Q);
+}
@@ -0,0 +1,24 @@
+""" cffi build script for the optional SIMD sweep kernel in sweep_kernel.c, run by setup.py
+No -mavx2/-mfma: the kernel enables AVX2 per function and checks for it at run
+time, so the module builds on any platform and runs on any x86-64 CPU.
+"""
+from cffi import FFI
+
+SWEEP_LOOP = """
+void sweep_loop(int64_t n, double storage_o, double H_o, int64_t n_k,
+                const double *coefs, const double *flow_consts,
+                int64_t n_curve, const double *cap_stor, const double *cap_head,
+                double x0, double inv_dx, int64_t n_bucket, const int64_t *bucket,
+                float *head, float *storage_initial, float *storage_final, float *Q,
+                int64_t *n_active);
+int sweep_avx2_supported(void);
+"""
+
+ffibuilder = FFI()
+ffibuilder.cdef(SWEEP_LOOP)
+ffibuilder.set_source("_sweep_kernel", "#include <stdint.h>\n" + SWEEP_LOOP,
+                      sources=["sweep_kernel.c"],
+                      extra_compile_args=["-O3"])
+
+if __name__ == "__main__":
+    ffibuilder.compile(verbose=True)
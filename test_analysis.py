@@ -0,0 +1,103 @@
+""" Checks of the drawdown analysis on the bundled area capacity curves
+    python -m unittest test_analysis
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import DrawDownAnalysis as dda
+
+CURVES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "area-capacity-curve")
+AREA = os.path.join(CURVES, "elev-area-curve-1977.csv")
+CAPACITY = os.path.join(CURVES, "elev-storage-curve-1977.csv")
+
+
+def _analysis(capacity=CAPACITY, dt=1, n_steps=1100, H_o=85):
+    a = dda.DrawDownAnalysis(dt=dt, n_steps=n_steps)
+    a.assignOutletParams(2, 36/12, 3)
+    a.assignResevoirParams(2224, H_o)
+    a.assignAreaCapacityCurves(AREA, capacity)
+    a.assignDrawDownTargetElev(2209.6)
+    return a
+
+
+class TestCurves(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.reference = _analysis()
+        cls.reference.runDrawdownAnalysis()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def write_capacity(self, name, df, **kwargs):
+        path = os.path.join(self.tmp, name)
+        df.to_csv(path, index=False, **kwargs)
+        return path
+
+    def assertSameDrawdown(self, capacity):
+        a = _analysis(capacity)
+        np.testing.assert_array_equal(a._cap_stor, self.reference._cap_stor)
+        np.testing.assert_array_equal(a._cap_elev, self.reference._cap_elev)
+        a.runDrawdownAnalysis()
+        self.assertEqual(a.summarize(verbose=False), self.reference.summarize(verbose=False))
+
+    def test_quoted_header(self):
+        df = pd.read_csv(CAPACITY)
+        self.assertSameDrawdown(self.write_capacity("quoted.csv", df, quoting=1))
+
+    def test_swapped_columns(self):
+        df = pd.read_csv(CAPACITY)[['elev-ft', 'storage-acre-ft']]
+        self.assertSameDrawdown(self.write_capacity("swapped.csv", df))
+
+    def test_extra_column(self):
+        df = pd.read_csv(CAPACITY).assign(note="1977 survey")
+        self.assertSameDrawdown(self.write_capacity("extra.csv", df))
+
+    def test_missing_column(self):
+        df = pd.read_csv(CAPACITY)[['elev-ft']]
+        a = _analysis(self.write_capacity("missing.csv", df))
+        self.assertIsNone(a._cap_stor)
+
+
+class TestMethods(unittest.TestCase):
+
+    def drained(self, dt, method="euler", H_o=85):
+        a = _analysis(dt=dt, n_steps=int(1100 / dt), H_o=H_o)
+        a.runDrawdownAnalysis(method)
+        return a.summarize(verbose=False)[1]
+
+    def test_time_step_agrees_with_lsoda(self):
+        t_lsoda = self.drained(1, "lsoda")
+        for dt in (0.5, 1, 2):
+            with self.subTest(dt=dt):
+                self.assertAlmostEqual(self.drained(dt), t_lsoda, delta=0.25)
+
+    def test_never_drains(self):
+        # the outlet is below the bottom of the capacity curve
+        for method in ("euler", "lsoda"):
+            with self.subTest(method=method):
+                self.assertTrue(np.isnan(self.drained(1, method, H_o=95)))
+
+    def test_lsoda_failure(self):
+        from scipy.integrate import solve_ivp
+        def failing_solve_ivp(*args, **kwargs):
+            sol = solve_ivp(*args, **kwargs)
+            sol.success, sol.status, sol.message = False, -1, "Integration step failed."
+            return sol
+        a = _analysis()
+        with mock.patch("scipy.integrate.solve_ivp", failing_solve_ivp):
+            a.runDrawdownAnalysis("lsoda")
+        self.assertEqual(a._results, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+""" Checks that every available time-stepping kernel gives identical results
+    python -m unittest test_kernels
+The compiled kernels (see setup.py) are checked when they are built
+"""
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import DrawDownAnalysis as dda
+
+CURVES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "area-capacity-curve")
+AREA = os.path.join(CURVES, "elev-area-curve-1977.csv")
+CAPACITY = os.path.join(CURVES, "elev-storage-curve-1977.csv")
+
+# Loss coefficients of the sensitivity scenarios; K=300 never drains within the
+# analysis steps, and 9 scenarios leave a remainder for the SIMD kernel
+K_VALUES = [3, 3.75, 4.5, 6, 15, 30, 300, 1.0, 2.2]
+
+
+def _python_loop(n, storage_o, H_o, coefs, flow_consts, cap_stor, cap_head, x0, inv_dx, bucket,
+                 head, storage_initial, storage_final, Q, n_active):
+    """ Reference kernel: _step_loop over each scenario, run as plain python even
+    when numba is installed
+    """
+    step_loop = getattr(dda._step_loop, "py_func", dda._step_loop)
+    interp = getattr(dda._interp_uniform, "py_func", dda._interp_uniform)
+    with mock.patch.object(dda, "_interp_uniform", interp):
+        for k in range(len(coefs)):
+            n_active[k] = step_loop(n, storage_o, H_o, coefs[k], flow_consts[k],
+                                    cap_stor, cap_head, x0, inv_dx, bucket,
+                                    head[k], storage_initial[k], storage_final[k], Q[k])
+
+
+def _kernels():
+    """ Kernels to check against the plain python loop
+    """
+    kernels = {"numpy": dda._sweep_numpy,
+               "numba" if dda.NUMBA_AVAILABLE else "sweep_loop": dda._sweep_loop}
+    try:
+        from _drawdown_kernel import sweep_loop
+        kernels["cython"] = sweep_loop
+    except ImportError:
+        pass
+    if hasattr(dda, "_sweep_lib"):
+        kernels["simd"] = dda._sweep_simd
+    return kernels
+
+
+class TestKernels(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.kernel = staticmethod(dda._sweep_kernel)
+        cls.analysis = dda.DrawDownAnalysis(dt=1, n_steps=1100)
+        cls.analysis.assignOutletParams(2, 36/12, 3)
+        cls.analysis.assignResevoirParams(2224, 85)
+        cls.analysis.assignAreaCapacityCurves(AREA, CAPACITY)
+
+    @classmethod
+    def tearDownClass(cls):
+        dda._sweep_kernel = cls.kernel
+
+    def run_kernel(self, kernel, H_o):
+        a = self.analysis
+        dda._sweep_kernel = kernel
+        a.H_o = H_o
+        return a._runScenarios([a.N_mult * dda._discharge(1.0, a.area, k, a.GRAVITY)
+                                for k in K_VALUES])
+
+    def test_kernels_agree(self):
+        for H_o in (85, -1):
+            ref_results, ref_n_active = self.run_kernel(_python_loop, H_o)
+            for name, kernel in _kernels().items():
+                with self.subTest(kernel=name, H_o=H_o):
+                    results, n_active = self.run_kernel(kernel, H_o)
+                    np.testing.assert_array_equal(n_active, ref_n_active)
+                    for ref, result in zip(ref_results, results):
+                        for column in ref:
+                            np.testing.assert_array_equal(result[column], ref[column],
+                                                          err_msg=column)
+
+    def test_scenario_never_drains(self):
+        _, n_active = self.run_kernel(self.kernel, 85)
+        i = K_VALUES.index(300)
+        self.assertEqual(n_active[i], self.analysis.n_steps)
+        self.assertTrue((np.delete(n_active, i) < self.analysis.n_steps).all())
+
+
+if __name__ == '__main__':
+    unittest.main()